@@ -7,9 +7,208 @@ falls back to a simple heuristic if the model isn't available.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
-from utils import get_openai_client, openai_json_completion, gemini_json_completion, to_float
+from platform_advisor import get_platform_tips
+from utils import get_openai_client, openai_json_completion, gemini_json_completion, settings, to_float
+
+
+# Separates the caller's custom_id from the candidate count in batch lines
+BATCH_COUNT_SEP = "#n="
+
+JUDGE_SYSTEM_PROMPT = (
+    "You are a precise evaluator. Score each candidate (0-10) based on:"
+    " 1) Tone alignment to the requested tone,"
+    " 2) Clarity and readability,"
+    " 3) Fit for the specified platform."
+    " Return a STRICT JSON object with a single key: scores (array of numbers, one per candidate, same order)."
+)
+
+
+_PROFESSIONAL_KEYWORDS = frozenset({"regards", "sincerely", "appreciate"})
+
+# Words whose presence earns a small bonus for the matching target tone
+TONE_KEYWORDS: Dict[str, FrozenSet[str]] = {
+    "professional": _PROFESSIONAL_KEYWORDS,
+    "formal": _PROFESSIONAL_KEYWORDS,
+    "friendly": frozenset({"thanks", "excited", "glad", "hey"}),
+    "persuasive": frozenset({"benefit", "impact", "value", "recommend"}),
+    "empathetic": frozenset({"understand", "appreciate", "support", "sorry"}),
+}
+
+WORD_RE = re.compile(r"[a-z]+")
+
+
+def heuristic_score(text: str, tone: str) -> float:
+    """Score a rewrite without an LLM; `tone` must already be lowercased."""
+
+    length = len(text)
+    # Prefer 100-350 chars for most platforms
+    if length <= 40:
+        base = 4.0
+    elif length <= 100:
+        base = 7.0
+    elif length <= 350:
+        base = 8.5
+    elif length <= 700:
+        base = 7.2
+    else:
+        base = 5.5
+
+    bonus = 0.0
+    if tone == "concise":
+        if length < 200:
+            bonus += 0.5
+    else:
+        keywords = TONE_KEYWORDS.get(tone)
+        if keywords and not keywords.isdisjoint(WORD_RE.findall(text.casefold())):
+            bonus += 0.5
+
+    return base + bonus
+
+
+SINGLE_JUDGE_SYSTEM_PROMPT = (
+    "You are a precise evaluator. Score the candidate (0-10) based on:"
+    " 1) Tone alignment to the requested tone,"
+    " 2) Clarity and readability,"
+    " 3) Fit for the specified platform."
+    " Return STRICT JSON object with a single key: score (number)."
+)
+
+
+def _judge_header(target_tone: str, platform: str | None) -> str:
+    tips = get_platform_tips(platform)
+    return f"Platform: {tips['platform']}\nPlatform guidance: {tips['tips']}\nTarget tone: {target_tone}\n"
+
+
+def build_judge_prompt(texts: List[str], *, message: str, target_tone: str, platform: str | None) -> str:
+    """Build the user prompt asking the judge to score `texts` in order.
+
+    The platform/tone block comes first so it stays a stable, cacheable
+    prefix; the message and candidates that change per call come last.
+    """
+
+    return (
+        _judge_header(target_tone, platform)
+        + "---\n"
+        f"Original message: {message}\n\n"
+        f"Candidates (score each of the {len(texts)} in order):\n" + "\n".join([f"- {t}" for t in texts])
+    )
+
+
+def build_judge_batch_request(
+    custom_id: str,
+    texts: List[str],
+    *,
+    message: str,
+    target_tone: str,
+    platform: str | None,
+    model: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Return one Batch API line that scores `texts` with the judge rubric.
+
+    The candidate count rides along as a `custom_id` suffix so results can be
+    validated without the input file; `parse_judge_batch_scores` strips it.
+    """
+
+    return {
+        "custom_id": f"{custom_id}{BATCH_COUNT_SEP}{len(texts)}",
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model or settings().openai_model,
+            "temperature": 0,
+            "messages": [
+                {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
+                {"role": "user", "content": build_judge_prompt(texts, message=message, target_tone=target_tone, platform=platform)},
+            ],
+            "response_format": {"type": "json_object"},
+        },
+    }
+
+
+def _valid_scores(result: Any, expected: int) -> Optional[List[float]]:
+    # JSON mode only allows objects, so the array comes wrapped as {"scores": [...]}
+    scores = result.get("scores") if isinstance(result, dict) else result
+    if isinstance(scores, list) and len(scores) == expected:
+        return [to_float(s, 0.0) for s in scores]
+    return None
+
+
+def parse_judge_batch_scores(custom_id: str, result: Any) -> Tuple[str, Optional[List[float]]]:
+    """Split the candidate count off a batch `custom_id` and validate its scores.
+
+    Returns the caller's original id and the scores, or None if they are
+    missing or do not match the candidate count.
+    """
+
+    original, sep, count = custom_id.rpartition(BATCH_COUNT_SEP)
+    if not sep or not count.isdigit():
+        return custom_id, None
+    return original, _valid_scores(result, int(count))
+
+
+async def _score_with_openai(client: Any, user: str, expected: int) -> Optional[List[float]]:
+    scores = await openai_json_completion(client=client, system_prompt=JUDGE_SYSTEM_PROMPT, user_prompt=user)
+    return _valid_scores(scores, expected)
+
+
+async def _score_with_gemini(
+    user: str, expected: int, primary: Optional["asyncio.Task[Optional[List[float]]]"] = None, delay: float = 0.0
+) -> Optional[List[float]]:
+    """Score with Gemini, hedging `primary` if given.
+
+    With a primary task, waits up to `delay` or until it ends without a
+    valid result; without one, starts immediately.
+    """
+
+    if primary is not None:
+        await asyncio.wait({primary}, timeout=delay)
+        if primary.done() and not primary.cancelled() and primary.exception() is None and primary.result() is not None:
+            return None
+    scores = await gemini_json_completion(system_prompt=JUDGE_SYSTEM_PROMPT, user_prompt=user)
+    return _valid_scores(scores, expected)
+
+
+async def _score_each_with_openai(
+    client: Any, texts: List[str], *, message: str, target_tone: str, platform: str | None
+) -> Optional[List[float]]:
+    """Score every candidate with its own request; concurrency is bounded in utils."""
+
+    header = _judge_header(target_tone, platform)
+
+    async def score_one(text: str) -> Optional[float]:
+        user = f"{header}---\nOriginal message: {message}\n\nCandidate: {text}"
+        result = await openai_json_completion(client=client, system_prompt=SINGLE_JUDGE_SYSTEM_PROMPT, user_prompt=user)
+        if isinstance(result, dict) and "score" in result:
+            return to_float(result["score"], 0.0)
+        return None
+
+    results = await asyncio.gather(*(score_one(t) for t in texts), return_exceptions=True)
+    if any(not isinstance(r, float) for r in results):
+        return None
+    return list(results)  # type: ignore[arg-type]
+
+
+async def _race_scores(tasks: List["asyncio.Task[Optional[List[float]]]"]) -> Optional[List[float]]:
+    """Return the first valid score list among `tasks`, cancelling the rest."""
+
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                scores = task.result()
+                if scores is not None:
+                    return scores
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
 
 
 async def rank_rewrites(
@@ -18,6 +217,7 @@ async def rank_rewrites(
     message: str,
     target_tone: str,
     platform: str | None,
+    per_candidate: bool = False,
 ) -> List[Dict[str, Any]]:
     """Return the same candidates with an added float `score` field.
 
@@ -26,79 +226,45 @@ async def rank_rewrites(
     - Clarity and readability
     - Platform fit (format, length, conventions)
 
-    Otherwise, use a simple heuristic that favors concise text and basic tone keywords.
+    A Gemini request is hedged after `RANK_HEDGE_DELAY_MS`, or sent as soon as
+    OpenAI fails or is unavailable, and the first valid answer wins. Otherwise, use a simple
+    heuristic that favors concise text and basic tone keywords.
+
+    With `per_candidate=True`, each candidate is scored by its own OpenAI
+    request in parallel, bounded by `OPENAI_CONCURRENCY`.
     """
 
-    client = get_openai_client()
-    if client is not None and candidates:
-        # Ask the model to score each candidate in order
-        system = (
-            "You are a precise evaluator. Score each candidate (0-10) based on:"
-            " 1) Tone alignment to the requested tone,"
-            " 2) Clarity and readability,"
-            " 3) Fit for the specified platform."
-            " Return STRICT JSON array of numbers, one per candidate, same order."
-        )
+    if candidates:
         # Keep just the text to reduce token usage
         texts = [c.get("rewritten_text", "") for c in candidates]
-        platform_str = platform or "generic"
-        user = (
-            f"Target tone: {target_tone}\nPlatform: {platform_str}\n\n"
-            f"Original message: {message}\n\n"
-            "Candidates (score each in order):\n" + "\n".join([f"- {t}" for t in texts])
-        )
-        try:
-            scores = await openai_json_completion(client=client, system_prompt=system, user_prompt=user)
-            if isinstance(scores, list) and len(scores) == len(candidates):
-                for i, s in enumerate(scores):
-                    candidates[i]["score"] = to_float(s, 0.0)
+        user = build_judge_prompt(texts, message=message, target_tone=target_tone, platform=platform)
+        expected = len(candidates)
+
+        client = get_openai_client()
+        if per_candidate and client is not None:
+            scores = await _score_each_with_openai(
+                client, texts, message=message, target_tone=target_tone, platform=platform
+            )
+            if scores is not None:
+                for candidate, score in zip(candidates, scores):
+                    candidate["score"] = score
                 return candidates
-        except Exception:
-            pass
-    
-    # Try Gemini if OpenAI failed or unavailable
-    try:
-        scores = await gemini_json_completion(system_prompt=system, user_prompt=user)
-        if isinstance(scores, list) and len(scores) == len(candidates):
-            for i, s in enumerate(scores):
-                candidates[i]["score"] = to_float(s, 0.0)
-            return candidates
-    except Exception:
-        pass
 
-    # Heuristic fallback
-    def heuristic_score(text: str) -> float:
-        length = len(text)
-        # Prefer 100-350 chars for most platforms
-        if length <= 40:
-            base = 4.0
-        elif length <= 100:
-            base = 7.0
-        elif length <= 350:
-            base = 8.5
-        elif length <= 700:
-            base = 7.2
+        if client is not None:
+            primary = asyncio.create_task(_score_with_openai(client, user, expected))
+            hedge = _score_with_gemini(user, expected, primary, settings().rank_hedge_delay_ms / 1000)
+            tasks = [primary, asyncio.create_task(hedge)]
         else:
-            base = 5.5
+            tasks = [asyncio.create_task(_score_with_gemini(user, expected))]
 
-        tone = target_tone.lower()
-        txt = text.lower()
-        bonus = 0.0
-        if tone in ("professional", "formal") and any(k in txt for k in ["regards", "sincerely", "appreciate"]):
-            bonus += 0.5
-        if tone in ("friendly",) and any(k in txt for k in ["thanks", "excited", "glad", "hey"]):
-            bonus += 0.5
-        if tone in ("concise",) and length < 200:
-            bonus += 0.5
-        if tone in ("persuasive",) and any(k in txt for k in ["benefit", "impact", "value", "recommend"]):
-            bonus += 0.5
-        if tone in ("empathetic",) and any(k in txt for k in ["understand", "appreciate", "support", "sorry"]):
-            bonus += 0.5
-
-        return base + bonus
+        scores = await _race_scores(tasks)
+        if scores is not None:
+            for candidate, score in zip(candidates, scores):
+                candidate["score"] = score
+            return candidates
 
+    # Heuristic fallback
+    tone = target_tone.lower()
     for c in candidates:
-        c["score"] = heuristic_score(str(c.get("rewritten_text", "")))
+        c["score"] = heuristic_score(str(c.get("rewritten_text", "")), tone)
     return candidates
-
-
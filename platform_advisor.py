@@ -6,7 +6,8 @@ The logic is intentionally simple and static for MVP reliability.
 
 from __future__ import annotations
 
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Mapping
 
 
 PLATFORM_TIPS: Dict[str, str] = {
@@ -18,25 +19,55 @@ PLATFORM_TIPS: Dict[str, str] = {
 }
 
 
-def get_platform_tips(platform: str | None) -> Dict[str, str]:
+# Common alternate spellings mapped to their canonical platform key
+PLATFORM_ALIASES: Dict[str, str] = {
+    "x": "twitter",
+    "e-mail": "email",
+    "text": "sms",
+}
+
+_GENERIC: Mapping[str, str] = MappingProxyType({
+    "platform": "generic",
+    "tips": "Adapt tone to the audience; keep it clear, short, and respectful.",
+})
+
+
+def _build_lookup() -> Dict[str, Mapping[str, str]]:
+    """Precompute read-only tips keyed by canonical names, aliases, and common casings."""
+
+    canonical = {k: MappingProxyType({"platform": k, "tips": v}) for k, v in PLATFORM_TIPS.items()}
+    lookup: Dict[str, Mapping[str, str]] = {}
+    names = [(k, k) for k in canonical] + list(PLATFORM_ALIASES.items())
+    names += [("LinkedIn", "linkedin"), ("WhatsApp", "whatsapp"), ("SMS", "sms")]
+    for name, key in names:
+        for variant in (name, name.lower(), name.capitalize(), name.upper()):
+            lookup[variant] = canonical[key]
+    return lookup
+
+
+_LOOKUP = _build_lookup()
+
+
+def get_platform_tips(platform: str | None) -> Mapping[str, str]:
     """Return platform-specific tips and a normalized platform name.
 
-    If the platform is None or unknown, provide a generic tip.
+    If the platform is None or unknown, provide a generic tip. Known platforms
+    return a shared read-only mapping; callers must not mutate it.
     """
 
     if not platform:
-        return {
-            "platform": "generic",
-            "tips": "Adapt tone to the audience; keep it clear, short, and respectful.",
-        }
-
-    key = platform.strip().lower()
-    tip = PLATFORM_TIPS.get(key)
-    if tip:
-        return {"platform": key, "tips": tip}
+        return _GENERIC
+
+    # Exact hits on common spellings avoid normalizing the string at all
+    tips = _LOOKUP.get(platform)
+    if tips is not None:
+        return tips
+
+    key = platform.strip().casefold()
+    tips = _LOOKUP.get(key)
+    if tips is not None:
+        return tips
     return {
         "platform": key,
         "tips": "No specific guidance found; keep it concise and audience-appropriate.",
     }
-
-
@@ -9,18 +9,21 @@ generation when available and falls back to local heuristics otherwise.
 from __future__ import annotations
 
 import asyncio
-import json
 import os
 from typing import Any, Dict, List, Optional
 
+import msgspec
+import orjson
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
 from tone_analyzer import analyze_tone
-from vibe_generator import generate_vibes
+from vibe_generator import generate_scored_vibes, generate_vibes, stream_vibes, warm_retriever
 from platform_advisor import get_platform_tips
-from utils import load_environment
-from judge_rerank import rank_rewrites
+from utils import (CACHE_STATS, close_openai_client, get_batch_result,
+                   get_openai_client, load_environment, reload_settings, settings, submit_batch)
+from judge_rerank import build_judge_batch_request, parse_judge_batch_scores, rank_rewrites
 from rag.store import seed_guidelines, upsert_user_example
 from moderation import mask_pii, moderate_text
 
@@ -34,10 +37,12 @@ except Exception:  # pragma: no cover
     MCP_AVAILABLE = False
 
 
-# ----------------------------- Pydantic Models ----------------------------- #
+# ------------------------------ Response Models ----------------------------- #
+# Responses are msgspec Structs: LLM output is validated and encoded in one
+# pass, which is much cheaper than building Pydantic models item by item.
 
 
-class VibeItem(BaseModel):
+class VibeItem(msgspec.Struct, frozen=True):
     """A single vibe rewrite output item."""
 
     vibe: str
@@ -46,21 +51,14 @@ class VibeItem(BaseModel):
     use_cases: List[str]
 
 
-class ToneResult(BaseModel):
+class ToneResult(msgspec.Struct, frozen=True):
     """Tone analysis result for the input message."""
 
     overall_tone: str
     rationale: str
 
 
-class RewriteVibesRequest(BaseModel):
-    """Input schema for the rewrite tool/API."""
-
-    message: str = Field(..., description="Original message to rewrite.")
-    platform: Optional[str] = Field(None, description="Optional platform context (e.g., WhatsApp, LinkedIn, Email)")
-
-
-class RewriteVibesResponse(BaseModel):
+class RewriteVibesResponse(msgspec.Struct, frozen=True):
     """Response schema including tone, five vibes, and platform tips."""
 
     original_message: str
@@ -69,6 +67,41 @@ class RewriteVibesResponse(BaseModel):
     platform_tips: Dict[str, str]
 
 
+class RankedCandidate(msgspec.Struct, frozen=True):
+    """A ranked rewrite with score."""
+
+    vibe: str
+    rewritten_text: str
+    explanation: str
+    use_cases: List[str]
+    score: float
+
+
+class RewriteTopResponse(msgspec.Struct, frozen=True):
+    """Response for top-N ranked rewrites for a single target tone."""
+
+    original_message: str
+    target_tone: str
+    platform_tips: Dict[str, str]
+    top_rewrites: List[RankedCandidate]
+
+
+def msgspec_response(obj: Any) -> Response:
+    """Encode a msgspec Struct straight to an HTTP JSON response."""
+
+    return Response(content=msgspec.json.encode(obj), media_type="application/json")
+
+
+# ----------------------------- Pydantic Models ----------------------------- #
+
+
+class RewriteVibesRequest(BaseModel):
+    """Input schema for the rewrite tool/API."""
+
+    message: str = Field(..., description="Original message to rewrite.")
+    platform: Optional[str] = Field(None, description="Optional platform context (e.g., WhatsApp, LinkedIn, Email)")
+
+
 class FeedbackRequest(BaseModel):
     """User feedback to store an accepted rewrite as a style example for RAG."""
 
@@ -88,84 +121,135 @@ class RewriteTopRequest(BaseModel):
     num_candidates: int = Field(3, ge=1, le=10, description="How many top candidates to return (default 3)")
 
 
-class RankedCandidate(BaseModel):
-    """A ranked rewrite with score."""
+class BatchRerankItem(BaseModel):
+    """One message and its candidate rewrites to score offline."""
 
-    vibe: str
-    rewritten_text: str
-    explanation: str
-    use_cases: List[str]
-    score: float
+    custom_id: str = Field(..., description="Caller-chosen id used to match results")
+    message: str
+    target_tone: str
+    platform: Optional[str] = None
+    candidates: List[str] = Field(..., min_length=1)
 
 
-class RewriteTopResponse(BaseModel):
-    """Response for top-N ranked rewrites for a single target tone."""
+class BatchRerankRequest(BaseModel):
+    """Items to score through the OpenAI Batch API."""
 
-    original_message: str
-    target_tone: str
-    platform_tips: Dict[str, str]
-    top_rewrites: List[RankedCandidate]
+    items: List[BatchRerankItem] = Field(..., min_length=1)
 
 
 # ------------------------------- FastAPI App ------------------------------- #
 
 
 load_environment()
-app = FastAPI(title="Social Vibe Translator", version="0.1.0")
+app = FastAPI(title="Social Vibe Translator", version="0.1.0", default_response_class=ORJSONResponse)
+
+
+@app.on_event("startup")
+async def _startup() -> None:
+    """Create the shared OpenAI client and warm the RAG retriever unless RAG is disabled."""
+    app.state.openai = get_openai_client()
+    if settings().rag_enabled:
+        await asyncio.to_thread(warm_retriever)
+
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    """Close the shared OpenAI HTTP connection pool."""
+    await close_openai_client()
 
 
-@app.post("/rewrite_vibes", response_model=RewriteVibesResponse)
-async def rewrite_vibes_api(payload: RewriteVibesRequest) -> RewriteVibesResponse:
+async def score_top_candidates(message: str, *, platform: Optional[str], target_tone: str) -> List[Dict[str, Any]]:
+    """Generate and score the five vibes, preferring a single fused LLM call.
+
+    The fused completion returns vibes and scores together. When scores are
+    missing (cached or fallback vibes, malformed output) `rank_rewrites`
+    scores the candidates instead.
+    """
+
+    candidates, scores = await generate_scored_vibes(message, platform=platform, target_tone=target_tone)
+    if scores is not None:
+        for candidate, score in zip(candidates, scores):
+            candidate["score"] = score
+        return candidates
+
+    # Use all candidates and let the ranker choose best matches to target_tone
+    return await rank_rewrites(
+        candidates=candidates,
+        message=message,
+        target_tone=target_tone,
+        platform=platform,
+    )
+
+
+@app.post("/rewrite_vibes")
+async def rewrite_vibes_api(payload: RewriteVibesRequest) -> Response:
     """HTTP endpoint to analyze and rewrite a message into five vibes."""
 
-    # Light moderation and PII masking
-    _ = await moderate_text(payload.message)
+    # Light moderation and PII masking; the three calls are independent
     clean_message = mask_pii(payload.message)
-
-    tone = await analyze_tone(clean_message)
-    vibes = await generate_vibes(clean_message, platform=payload.platform)
+    _, tone, vibes = await asyncio.gather(
+        moderate_text(payload.message),
+        analyze_tone(clean_message),
+        generate_vibes(clean_message, platform=payload.platform),
+    )
     tips = get_platform_tips(payload.platform)
 
-    return RewriteVibesResponse(
-        original_message=payload.message,
-        tone_analysis=ToneResult(**tone),
-        vibes=[VibeItem(**v) for v in vibes],
-        platform_tips=tips,
+    response = msgspec.convert(
+        {"original_message": payload.message, "tone_analysis": tone, "vibes": vibes, "platform_tips": tips},
+        RewriteVibesResponse,
     )
+    return msgspec_response(response)
 
 
-@app.post("/rewrite_top", response_model=RewriteTopResponse)
-async def rewrite_top_api(payload: RewriteTopRequest) -> RewriteTopResponse:
-    """Return top-N ranked rewrites for a chosen target tone.
+@app.post("/rewrite_vibes_stream")
+async def rewrite_vibes_stream_api(payload: RewriteVibesRequest) -> StreamingResponse:
+    """Stream the rewrite as NDJSON: one line per vibe, then tone and tips.
 
-    We reuse the 5 vibes generator, then filter/select candidates whose vibe
-    matches the `target_tone` or is closest by name. If not found, we use
-    all candidates and let the ranker decide.
+    Each line is an object with a `type` of `vibe`, `tone_analysis`, or
+    `platform_tips`. Vibes are sent as soon as the model finishes each one.
     """
 
-    _ = await moderate_text(payload.message)
     clean_message = mask_pii(payload.message)
-    all_candidates = await generate_vibes(clean_message, platform=payload.platform)
 
-    # Use all candidates and let the ranker choose best matches to target_tone
-    candidates = all_candidates
+    async def lines():
+        moderation = asyncio.create_task(moderate_text(payload.message))
+        tone_task = asyncio.create_task(analyze_tone(clean_message))
+        try:
+            async for vibe in stream_vibes(clean_message, platform=payload.platform):
+                yield orjson.dumps({"type": "vibe", **msgspec.to_builtins(msgspec.convert(vibe, VibeItem))}) + b"\n"
+            tone = await tone_task
+            yield orjson.dumps({"type": "tone_analysis", **msgspec.to_builtins(msgspec.convert(tone, ToneResult))}) + b"\n"
+            yield orjson.dumps({"type": "platform_tips", **get_platform_tips(payload.platform)}) + b"\n"
+            await moderation
+        finally:
+            tone_task.cancel()
+            moderation.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/rewrite_top")
+async def rewrite_top_api(payload: RewriteTopRequest) -> Response:
+    """Return top-N ranked rewrites for a chosen target tone.
 
-    scored = await rank_rewrites(
-        candidates=candidates,
-        message=clean_message,
-        target_tone=payload.target_tone,
-        platform=payload.platform,
+    Vibes and scores come from one fused completion when possible; otherwise
+    we reuse the 5 vibes generator and let the ranker score all candidates.
+    """
+
+    clean_message = mask_pii(payload.message)
+    _, scored = await asyncio.gather(
+        moderate_text(payload.message),
+        score_top_candidates(clean_message, platform=payload.platform, target_tone=payload.target_tone),
     )
     # Sort by score desc and take top N
     topn = sorted(scored, key=lambda x: float(x.get("score", 0.0)), reverse=True)[: payload.num_candidates]
     tips = get_platform_tips(payload.platform)
 
-    return RewriteTopResponse(
-        original_message=clean_message,
-        target_tone=payload.target_tone,
-        platform_tips=tips,
-        top_rewrites=[RankedCandidate(**c) for c in topn],
+    response = msgspec.convert(
+        {"original_message": clean_message, "target_tone": payload.target_tone, "platform_tips": tips, "top_rewrites": topn},
+        RewriteTopResponse,
     )
+    return msgspec_response(response)
 
 
 # --------------------------- MCP Tool Registration ------------------------- #
@@ -202,22 +286,21 @@ if MCP_AVAILABLE:
         message = str(params.get("message", ""))
         platform = params.get("platform")
         if not message:
-            return json.dumps({"error": "message is required"})
+            return orjson.dumps({"error": "message is required"}).decode()
 
-        _ = await moderate_text(message)
         clean_message = mask_pii(message)
-
-        tone = await analyze_tone(clean_message)
-        vibes = await generate_vibes(clean_message, platform=platform)
+        _, tone, vibes = await asyncio.gather(
+            moderate_text(message),
+            analyze_tone(clean_message),
+            generate_vibes(clean_message, platform=platform),
+        )
         tips = get_platform_tips(platform)
 
-        response = RewriteVibesResponse(
-            original_message=clean_message,
-            tone_analysis=ToneResult(**tone),
-            vibes=[VibeItem(**v) for v in vibes],
-            platform_tips=tips,
+        response = msgspec.convert(
+            {"original_message": clean_message, "tone_analysis": tone, "vibes": vibes, "platform_tips": tips},
+            RewriteVibesResponse,
         )
-        return response.json()
+        return msgspec.json.encode(response).decode()
 
     # Additional MCP tool for top-ranked rewrites
     rewrite_top_tool = Tool(
@@ -243,30 +326,21 @@ if MCP_AVAILABLE:
         target_tone = str(params.get("target_tone", ""))
         num_candidates = int(params.get("num_candidates", 3))
         if not message or not target_tone:
-            return json.dumps({"error": "message and target_tone are required"})
+            return orjson.dumps({"error": "message and target_tone are required"}).decode()
 
-        _ = await moderate_text(message)
         clean_message = mask_pii(message)
-        all_candidates = await generate_vibes(clean_message, platform=platform)
-        # Use all candidates and let the ranker choose best matches to target_tone
-        candidates = all_candidates
-
-        scored = await rank_rewrites(
-            candidates=candidates,
-            message=clean_message,
-            target_tone=target_tone,
-            platform=platform,
+        _, scored = await asyncio.gather(
+            moderate_text(message),
+            score_top_candidates(clean_message, platform=platform, target_tone=target_tone),
         )
         topn = sorted(scored, key=lambda x: float(x.get("score", 0.0)), reverse=True)[: num_candidates]
         tips = get_platform_tips(platform)
 
-        payload = RewriteTopResponse(
-            original_message=clean_message,
-            target_tone=target_tone,
-            platform_tips=tips,
-            top_rewrites=[RankedCandidate(**c) for c in topn],
+        payload = msgspec.convert(
+            {"original_message": clean_message, "target_tone": target_tone, "platform_tips": tips, "top_rewrites": topn},
+            RewriteTopResponse,
         )
-        return payload.json()
+        return msgspec.json.encode(payload).decode()
 
     # Expose handler.router as the MCP path if needed by hosting platform
     # Users can run stdio server via: `python -m <module> --stdio`
@@ -306,6 +380,57 @@ async def feedback_accept(payload: FeedbackRequest) -> Dict[str, str]:
     return {"stored": doc_id}
 
 
+@app.post("/batch_rerank")
+async def batch_rerank(payload: BatchRerankRequest) -> Dict[str, str]:
+    """Queue judge scoring for many items as one discounted OpenAI Batch job."""
+
+    requests = [
+        build_judge_batch_request(
+            item.custom_id,
+            item.candidates,
+            message=mask_pii(item.message),
+            target_tone=item.target_tone,
+            platform=item.platform,
+        )
+        for item in payload.items
+    ]
+    try:
+        batch_id = await submit_batch(requests)
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+    return {"status": "submitted", "batch_id": batch_id}
+
+
+@app.get("/batch_result/{batch_id}")
+async def batch_result(batch_id: str) -> Dict[str, Any]:
+    """Poll a batch job; includes scores per `custom_id` once completed.
+
+    A `custom_id` maps to null when its output had the wrong shape or count.
+    """
+
+    try:
+        return await get_batch_result(batch_id, parse=parse_judge_batch_scores)
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+@app.post("/reload_settings")
+async def reload_settings_endpoint() -> Dict[str, bool]:
+    """Re-read environment settings (e.g. after rotating API keys)."""
+
+    current = reload_settings()
+    return {
+        "openai_configured": current.openai_api_key is not None,
+        "gemini_configured": current.google_api_key is not None,
+    }
+
+
+@app.get("/cache_stats")
+async def cache_stats() -> Dict[str, int]:
+    """Report completion cache hits and misses since process start."""
+    return dict(CACHE_STATS)
+
+
 @app.get("/test_gemini")
 async def test_gemini() -> Dict[str, str]:
     """Test if Gemini generation is working."""
@@ -7,9 +7,53 @@ optionally enhance it with OpenAI if an API key is available.
 
 from __future__ import annotations
 
-from typing import Dict
+import functools
+import re
+from typing import Dict, FrozenSet, Tuple
 
-from utils import get_openai_client, openai_json_completion, truncate_text
+from utils import get_openai_client, openai_json_completion
+
+
+TONE_SYSTEM_PROMPT = (
+    "You analyze the tone of short user messages."
+    " Return strict JSON with keys: overall_tone (string), rationale (string)."
+)
+
+# Stable instructions sent ahead of the message so providers can reuse the
+# cached prompt prefix across requests; only the text after `---` varies.
+TONE_USER_HEADER = (
+    "Analyze the tone of the message below and return JSON only.\n"
+    "Pick overall_tone as a single word or short phrase, preferring one of:"
+    " Polite, Friendly, Positive, Neutral, Formal, Urgent, Apologetic, Frustrated, Negative.\n"
+    "Keep the rationale to one or two sentences that cite wording from the message."
+)
+
+
+MAX_MESSAGE_CHARS = 2000
+
+WORD_RE = re.compile(r"[a-z']+")
+
+# Checked in order; the first rule whose words or phrases appear wins
+_HEURISTIC_RULES: Tuple[Tuple[str, FrozenSet[str], Tuple[str, ...]], ...] = (
+    ("Polite", frozenset({"please", "kindly", "appreciate"}), ("would you",)),
+    ("Urgent", frozenset({"urgent", "asap", "now", "immediately"}), ()),
+    ("Apologetic", frozenset({"sorry", "apologize", "regret"}), ()),
+    ("Positive", frozenset({"great", "awesome", "thanks"}), ("thank you",)),
+)
+
+HEURISTIC_RATIONALE = "Heuristic analysis based on presence of polite, urgent, apologetic, or positive keywords."
+
+
+@functools.lru_cache(maxsize=512)
+def _heuristic_tone(message: str) -> Tuple[str, str]:
+    """Keyword-based tone guess, cached since demos and retries repeat messages."""
+
+    lowered = message.lower()
+    tokens = set(WORD_RE.findall(lowered))
+    for tone, words, phrases in _HEURISTIC_RULES:
+        if not words.isdisjoint(tokens) or any(p in lowered for p in phrases):
+            return tone, HEURISTIC_RATIONALE
+    return "Neutral", HEURISTIC_RATIONALE
 
 
 async def analyze_tone(message: str) -> Dict[str, str]:
@@ -19,42 +63,19 @@ async def analyze_tone(message: str) -> Dict[str, str]:
     Uses OpenAI if available; otherwise falls back to a heuristic.
     """
 
-    text = truncate_text(message, 2000)
+    # Inlined truncate_text: short messages are used as-is without a copy
+    text = message if len(message) <= MAX_MESSAGE_CHARS else message[: MAX_MESSAGE_CHARS - 3] + "..."
     client = get_openai_client()
 
-    system = (
-        "You analyze the tone of short user messages."
-        " Return strict JSON with keys: overall_tone (string), rationale (string)."
-    )
-    user = (
-        "Analyze the tone of this message and return JSON only.\n\n"
-        f"Message: {text}\n"
-    )
+    user = f"{TONE_USER_HEADER}\n---\nMessage: {text}\n"
 
     try:
-        result = await openai_json_completion(client=client, system_prompt=system, user_prompt=user)
+        result = await openai_json_completion(client=client, system_prompt=TONE_SYSTEM_PROMPT, user_prompt=user)
         if isinstance(result, dict) and "overall_tone" in result:
             return {"overall_tone": str(result.get("overall_tone", "Unknown")), "rationale": str(result.get("rationale", ""))}
     except Exception:
         # If OpenAI is unavailable, fall back to heuristic
         pass
 
-    # Simple heuristic fallback
-    lowered = message.lower()
-    if any(w in lowered for w in ["please", "would you", "kindly", "appreciate"]):
-        tone = "Polite"
-    elif any(w in lowered for w in ["urgent", "asap", "now", "immediately"]):
-        tone = "Urgent"
-    elif any(w in lowered for w in ["sorry", "apologize", "regret"]):
-        tone = "Apologetic"
-    elif any(w in lowered for w in ["great", "awesome", "thanks", "thank you"]):
-        tone = "Positive"
-    else:
-        tone = "Neutral"
-
-    return {
-        "overall_tone": tone,
-        "rationale": "Heuristic analysis based on presence of polite, urgent, apologetic, or positive keywords.",
-    }
-
-
+    tone, rationale = _heuristic_tone(text)
+    return {"overall_tone": tone, "rationale": rationale}
@@ -2,17 +2,22 @@
 Utility helpers for the Social Vibe Translator project.
 
 This module centralizes environment loading, OpenAI client setup,
-and common JSON-safe OpenAI generation helpers.
+common JSON-safe OpenAI generation helpers, and a small completion cache.
 """
 
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
+import hashlib
 import os
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Protocol, Tuple
 
+import orjson
+from cachetools import TTLCache
 from dotenv import load_dotenv
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 try:
     # Prefer the async client for non-blocking FastAPI endpoints
@@ -20,42 +25,227 @@ try:
 except Exception:  # pragma: no cover - keep import safe for environments without openai
     AsyncOpenAI = None  # type: ignore
 
+try:
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+
+    # APITimeoutError is a subclass of APIConnectionError
+    OPENAI_RETRYABLE_ERRORS: tuple = (RateLimitError, APIConnectionError, InternalServerError)
+except Exception:  # pragma: no cover
+    OPENAI_RETRYABLE_ERRORS = ()
+
+try:
+    import httpx
+except Exception:  # pragma: no cover - httpx ships with the openai SDK
+    httpx = None  # type: ignore
+
 try:
     import google.generativeai as genai
 except Exception:  # pragma: no cover
     genai = None  # type: ignore
 
+try:
+    from google.api_core import exceptions as google_exceptions
 
-def load_environment() -> None:
+    GEMINI_RETRYABLE_ERRORS: tuple = (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+    )
+except Exception:  # pragma: no cover
+    GEMINI_RETRYABLE_ERRORS = ()
+
+try:
+    import redis.asyncio as aioredis
+except Exception:  # pragma: no cover - Redis is an optional cache backend
+    aioredis = None  # type: ignore
+
+
+def load_environment(override: bool = False) -> None:
     """Load environment variables from a .env file if present.
 
     This allows the developer to place `OPENAI_API_KEY` (and other keys)
     in a `.env` file for local development without exporting them in shell profile.
+    With `override=True`, values in `.env` replace ones already in the environment.
     """
 
-    load_dotenv()
+    load_dotenv(override=override)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Snapshot of environment configuration read once per process."""
+
+    openai_api_key: Optional[str]
+    google_api_key: Optional[str]
+    openai_model: str
+    gemini_model: str
+    openai_max_per_second: float
+    gemini_max_per_second: float
+    llm_max_attempts: int
+    vibe_batch_window_ms: float
+    vibe_batch_max: int
+    vibe_parallel: bool
+    rag_enabled: bool
+    rag_top_k: int
+    rag_fetch_payload: str
+    openai_timeout_ms: float
+    openai_max_connections: int
+    openai_max_keepalive: int
+    openai_concurrency: int
+    rank_hedge_delay_ms: float
+    redis_url: Optional[str]
+
+
+@functools.lru_cache(maxsize=1)
+def settings() -> Settings:
+    """Return the cached settings snapshot; see `reload_settings` to refresh it."""
+
+    return Settings(
+        openai_api_key=os.getenv("OPENAI_API_KEY") or None,
+        google_api_key=os.getenv("GOOGLE_API_KEY") or None,
+        openai_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        gemini_model=os.getenv("GEMINI_MODEL", "gemini-1.5-flash"),
+        openai_max_per_second=float(os.getenv("OPENAI_MAX_PER_SECOND", "0")),
+        gemini_max_per_second=float(os.getenv("GEMINI_MAX_PER_SECOND", "0")),
+        llm_max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "5")),
+        vibe_batch_window_ms=float(os.getenv("VIBE_BATCH_WINDOW_MS", "0")),
+        vibe_batch_max=int(os.getenv("VIBE_BATCH_MAX", "8")),
+        vibe_parallel=os.getenv("VIBE_PARALLEL", "0") == "1",
+        rag_enabled=os.getenv("RAG_ENABLED", "1") != "0",
+        rag_top_k=int(os.getenv("RAG_TOP_K", "3")),
+        rag_fetch_payload=os.getenv("RAG_FETCH_PAYLOAD", "full"),
+        openai_timeout_ms=float(os.getenv("OPENAI_TIMEOUT_MS", "30000")),
+        openai_max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+        openai_max_keepalive=int(os.getenv("OPENAI_MAX_KEEPALIVE", "20")),
+        openai_concurrency=int(os.getenv("OPENAI_CONCURRENCY", "8")),
+        rank_hedge_delay_ms=float(os.getenv("RANK_HEDGE_DELAY_MS", "300")),
+        redis_url=os.getenv("REDIS_URL") or None,
+    )
+
+
+def reload_settings() -> Settings:
+    """Re-read `.env` and the environment, e.g. after rotating an API key."""
+
+    load_environment(override=True)
+    settings.cache_clear()
+    get_rate_limiter.cache_clear()
+    get_openai_semaphore.cache_clear()
+    return settings()
+
+
+class RateLimiter:
+    """Space out calls so at most `rate` start per second (0 disables limiting)."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        now = asyncio.get_running_loop().time()
+        # Reserve the next slot before sleeping so concurrent callers queue up
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+@functools.lru_cache(maxsize=None)
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Return the shared limiter for `provider` ("openai" or "gemini")."""
+
+    return RateLimiter(getattr(settings(), f"{provider}_max_per_second"))
+
+
+def _retrying(retryable: tuple) -> AsyncRetrying:
+    """Retry transient provider errors with jittered exponential backoff."""
+
+    return AsyncRetrying(
+        wait=wait_random_exponential(multiplier=1, max=30),
+        stop=stop_after_attempt(settings().llm_max_attempts),
+        retry=retry_if_exception_type(retryable),
+        reraise=True,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_openai_semaphore() -> asyncio.Semaphore:
+    """Return the bound on in-flight OpenAI requests per process, to stay under rate limits."""
+
+    return asyncio.Semaphore(settings().openai_concurrency)
+
+_OPENAI_CLIENT: Optional["AsyncOpenAI"] = None
+_OPENAI_CLIENT_KEY: Optional[str] = None
+_HTTP_CLIENT: Optional["httpx.AsyncClient"] = None
 
 
 def get_openai_client() -> Optional["AsyncOpenAI"]:
-    """Return an initialized OpenAI client if API key is available.
+    """Return the shared OpenAI client if API key is available.
 
-    Returns None if the OpenAI SDK is not installed or the API key is missing.
+    The client (and its underlying HTTP connection pool) is created once and
+    reused so keep-alive connections survive across requests. It is rebuilt
+    only if the API key changes. Returns None if the OpenAI SDK is not
+    installed or the API key is missing.
     """
 
-    api_key = os.getenv("OPENAI_API_KEY")
+    global _OPENAI_CLIENT, _OPENAI_CLIENT_KEY, _HTTP_CLIENT
+
+    api_key = settings().openai_api_key
     if AsyncOpenAI is None or not api_key:
         return None
-    return AsyncOpenAI(api_key=api_key)
+    if _OPENAI_CLIENT is not None and _OPENAI_CLIENT_KEY == api_key:
+        return _OPENAI_CLIENT
+
+    # No await between check and assignment, so this is safe on one event loop.
+    # SDK retries are off because openai_json_completion retries with backoff.
+    config = settings()
+    timeout = config.openai_timeout_ms / 1000
+    if _HTTP_CLIENT is None and httpx is not None:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.openai_max_connections,
+                max_keepalive_connections=config.openai_max_keepalive,
+            ),
+            timeout=timeout,
+        )
+    # The SDK sends its own per-request timeout, so it must be set here too
+    if _HTTP_CLIENT is not None:
+        _OPENAI_CLIENT = AsyncOpenAI(api_key=api_key, http_client=_HTTP_CLIENT, max_retries=0, timeout=timeout)
+    else:
+        _OPENAI_CLIENT = AsyncOpenAI(api_key=api_key, max_retries=0, timeout=timeout)
+    _OPENAI_CLIENT_KEY = api_key
+    return _OPENAI_CLIENT
+
+
+async def close_openai_client() -> None:
+    """Close the shared HTTP connection pool used by the OpenAI client."""
+
+    global _OPENAI_CLIENT, _OPENAI_CLIENT_KEY, _HTTP_CLIENT
+
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+    _OPENAI_CLIENT = None
+    _OPENAI_CLIENT_KEY = None
+    _HTTP_CLIENT = None
 
 
 def safe_json_parse(text: str) -> Any:
     """Safely parse JSON text, trimming code fences if present.
 
     Many LLM responses may wrap JSON in triple backticks; this helper removes
-    those fences and attempts to parse the inner JSON string.
+    those fences and attempts to parse the inner JSON string. Clean JSON
+    (the common case in JSON mode) is parsed directly with orjson.
     """
 
     cleaned = text.strip()
+    if cleaned[:1] in ("{", "["):
+        try:
+            return orjson.loads(cleaned)
+        except orjson.JSONDecodeError:
+            # Not fenced either, so a second parse would fail the same way
+            return text
     if cleaned.startswith("```"):
         # Remove the first fence line
         cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else cleaned
@@ -63,44 +253,181 @@ def safe_json_parse(text: str) -> Any:
         if cleaned.endswith("```"):
             cleaned = cleaned.rsplit("\n", 1)[0]
     try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
+        return orjson.loads(cleaned)
+    except orjson.JSONDecodeError:
         return text
 
 
+# ------------------------------ Completion Cache ----------------------------- #
+
+
+class LLMCache(Protocol):
+    """Minimal async key/value interface for caching parsed LLM completions."""
+
+    async def get(self, key: str) -> Any: ...
+
+    async def set(self, key: str, value: Any) -> None: ...
+
+
+class MemoryBackend:
+    """In-process TTL cache guarded by an asyncio lock."""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 600) -> None:
+        self._data: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Any:
+        async with self._lock:
+            return self._data.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        async with self._lock:
+            self._data[key] = value
+
+
+class RedisBackend:
+    """Redis-backed cache so repeated prompts are shared across workers."""
+
+    def __init__(self, url: str, ttl: int = 600, prefix: str = "svt:llm:") -> None:
+        if aioredis is None:
+            raise ValueError("redis is not available. Install redis package.")
+        self._redis = aioredis.from_url(url)
+        self._ttl = ttl
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Any:
+        raw = await self._redis.get(self._prefix + key)
+        return orjson.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._redis.set(self._prefix + key, orjson.dumps(value), ex=self._ttl)
+
+
+def build_cache(*, maxsize: int = 1024, ttl: int = 600, prefix: str = "svt:llm:") -> LLMCache:
+    """Pick Redis when `REDIS_URL` is set, otherwise the in-memory backend."""
+
+    url = settings().redis_url
+    if url and aioredis is not None:
+        return RedisBackend(url, ttl=ttl, prefix=prefix)
+    return MemoryBackend(maxsize=maxsize, ttl=ttl)
+
+
+_CACHE: Optional[LLMCache] = None
+CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def get_completion_cache() -> LLMCache:
+    """Return the process-wide completion cache, creating it on first use."""
+
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = build_cache()
+    return _CACHE
+
+
+def completion_cache_key(*, model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+    """Hash the prompt tuple that fully determines a completion."""
+
+    payload = orjson.dumps(
+        {"model": model, "sys": system_prompt, "user": user_prompt, "t": temperature},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+async def _cache_lookup(key: str) -> Any:
+    try:
+        value = await get_completion_cache().get(key)
+    except Exception:
+        value = None
+    if value is None:
+        CACHE_STATS["misses"] += 1
+    else:
+        CACHE_STATS["hits"] += 1
+    return value
+
+
+async def _cache_store(key: str, value: Any) -> None:
+    # Only cache parsed JSON; raw-text fallbacks are usually transient failures
+    if not isinstance(value, (dict, list)):
+        return
+    try:
+        await get_completion_cache().set(key, value)
+    except Exception:
+        pass
+
+
+_GEMINI_CONFIGURED_KEY: Optional[str] = None
+
+
+def _configure_gemini(api_key: str) -> None:
+    """Configure the Gemini SDK once per API key instead of on every call."""
+
+    global _GEMINI_CONFIGURED_KEY
+    if _GEMINI_CONFIGURED_KEY != api_key:
+        genai.configure(api_key=api_key)
+        _GEMINI_CONFIGURED_KEY = api_key
+
+
+@functools.lru_cache(maxsize=8)
+def _gemini_model(api_key: str, model: str) -> Any:
+    # api_key is part of the key so a rotated key gets a fresh model object
+    return genai.GenerativeModel(model)
+
+
+@functools.lru_cache(maxsize=16)
+def _gemini_generation_config(temperature: float) -> Any:
+    return genai.types.GenerationConfig(temperature=temperature, candidate_count=1)
+
+
 async def gemini_json_completion(
     *,
     system_prompt: str,
     user_prompt: str,
-    model: str = "gemini-1.5-flash",
+    model: Optional[str] = None,
     temperature: float = 0.7,
+    cache: bool = False,
 ) -> Any:
-    """Call Gemini API and try to parse the response as JSON."""
-    
+    """Call Gemini API and try to parse the response as JSON.
+
+    Results are cached when `temperature == 0` or `cache=True`.
+    """
+
+    model = model or settings().gemini_model
+    use_cache = cache or temperature == 0
+    if use_cache:
+        key = completion_cache_key(model=model, system_prompt=system_prompt, user_prompt=user_prompt, temperature=temperature)
+        cached = await _cache_lookup(key)
+        if cached is not None:
+            return cached
+
     if genai is None:
         raise ValueError("google-generativeai is not available. Install google-generativeai package.")
     
-    api_key = os.getenv("GOOGLE_API_KEY")
+    api_key = settings().google_api_key
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not set")
     
-    genai.configure(api_key=api_key)
+    _configure_gemini(api_key)
     
     # Combine system and user prompts for Gemini
     full_prompt = f"{system_prompt}\n\nUser request: {user_prompt}\n\nRespond with valid JSON only:"
     
-    model_obj = genai.GenerativeModel(model)
-    response = await asyncio.to_thread(
-        model_obj.generate_content,
-        full_prompt,
-        generation_config=genai.types.GenerationConfig(
-            temperature=temperature,
-            candidate_count=1,
-        )
-    )
+    model_obj = _gemini_model(api_key, model)
+    async for attempt in _retrying(GEMINI_RETRYABLE_ERRORS):
+        with attempt:
+            await get_rate_limiter("gemini").acquire()
+            response = await asyncio.to_thread(
+                model_obj.generate_content,
+                full_prompt,
+                generation_config=_gemini_generation_config(temperature),
+            )
     
     content = response.text if response.text else "{}"
-    return safe_json_parse(content)
+    result = safe_json_parse(content)
+    if use_cache:
+        await _cache_store(key, result)
+    return result
 
 
 async def openai_json_completion(
@@ -108,12 +435,14 @@ async def openai_json_completion(
     client: Optional["AsyncOpenAI"],
     system_prompt: str,
     user_prompt: str,
-    model: str = "gpt-4o-mini",
+    model: Optional[str] = None,
     temperature: float = 0.7,
+    cache: bool = False,
 ) -> Any:
     """Call OpenAI Chat Completions API and try to parse the response as JSON.
 
     If the client is None (no key or SDK), tries Gemini fallback first.
+    Results are cached when `temperature == 0` or `cache=True`.
     """
 
     # Try Gemini first if OpenAI is not available
@@ -123,24 +452,202 @@ async def openai_json_completion(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=temperature,
+                cache=cache,
             )
         except Exception:
             raise ValueError("Neither OpenAI nor Gemini clients are available.")
 
-    completion = await client.chat.completions.create(
-        model=model,
-        temperature=temperature,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format={"type": "json_object"},
-    )  # type: ignore[call-arg]
+    model = model or settings().openai_model
+    use_cache = cache or temperature == 0
+    if use_cache:
+        key = completion_cache_key(model=model, system_prompt=system_prompt, user_prompt=user_prompt, temperature=temperature)
+        cached = await _cache_lookup(key)
+        if cached is not None:
+            return cached
+
+    async for attempt in _retrying(OPENAI_RETRYABLE_ERRORS):
+        with attempt:
+            await get_rate_limiter("openai").acquire()
+            async with get_openai_semaphore():
+                completion = await client.chat.completions.create(
+                    model=model,
+                    temperature=temperature,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    response_format={"type": "json_object"},
+                )  # type: ignore[call-arg]
 
     content = completion.choices[0].message.content if completion.choices else "{}"
     if content is None:
         content = "{}"
-    return safe_json_parse(content)
+    result = safe_json_parse(content)
+    if use_cache:
+        await _cache_store(key, result)
+    return result
+
+
+async def openai_json_stream(
+    *,
+    client: "AsyncOpenAI",
+    system_prompt: str,
+    user_prompt: str,
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+) -> AsyncIterator[str]:
+    """Stream a JSON-mode chat completion, yielding raw text deltas.
+
+    A background task drains the stream into a queue, so the shared
+    concurrency slot is released once OpenAI finishes sending rather than
+    when a slow consumer finishes reading.
+    """
+
+    model = model or settings().openai_model
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            await get_rate_limiter("openai").acquire()
+            async with get_openai_semaphore():
+                stream = await client.chat.completions.create(
+                    model=model,
+                    temperature=temperature,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    response_format={"type": "json_object"},
+                    stream=True,
+                )  # type: ignore[call-arg]
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        queue.put_nowait(chunk.choices[0].delta.content)
+            queue.put_nowait(None)
+        except Exception as e:
+            queue.put_nowait(e)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Stop reading from OpenAI if the consumer goes away early
+        task.cancel()
+
+
+async def iter_array_objects(chunks: AsyncIterator[str], depth: int = 2) -> AsyncIterator[Any]:
+    """Yield each JSON object nested at `depth` as soon as it is complete.
+
+    With the default depth of 2 this picks out the elements of an array held
+    in a top-level object, e.g. each vibe in `{"vibes": [{...}, {...}]}`.
+    Objects that fail to parse are skipped.
+    """
+
+    buffer: List[str] = []
+    current = 0
+    in_string = False
+    escaped = False
+    start: Optional[int] = None
+    length = 0
+
+    async for chunk in chunks:
+        for ch in chunk:
+            buffer.append(ch)
+            length += 1
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+                continue
+            if ch == '"':
+                in_string = True
+            elif ch in "{[":
+                if ch == "{" and current == depth:
+                    start = length - 1
+                current += 1
+            elif ch in "}]":
+                current -= 1
+                if ch == "}" and current == depth and start is not None:
+                    parsed = safe_json_parse("".join(buffer[start:]))
+                    if isinstance(parsed, dict):
+                        yield parsed
+                    start = None
+                    # Drop consumed text so the buffer stays small
+                    buffer.clear()
+                    length = 0
+
+
+async def submit_batch(requests: List[Dict[str, Any]], *, client: Optional["AsyncOpenAI"] = None) -> str:
+    """Upload `requests` as a JSONL file and start an OpenAI Batch job.
+
+    Each request is a Batch API line (`custom_id`, `method`, `url`, `body`).
+    Returns the batch id. Batch jobs run at a discount within a 24h window,
+    so use this for offline work rather than live endpoints.
+    """
+
+    if client is None:
+        client = get_openai_client()
+    if client is None:
+        raise ValueError("OpenAI client is not available; the Batch API requires OPENAI_API_KEY.")
+    if not requests:
+        raise ValueError("No batch requests to submit.")
+
+    payload = b"\n".join(orjson.dumps(r) for r in requests)
+    uploaded = await client.files.create(file=("batch.jsonl", payload), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+async def get_batch_result(
+    batch_id: str,
+    *,
+    client: Optional["AsyncOpenAI"] = None,
+    parse: Optional[Callable[[str, Any], Tuple[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Return batch status and, once completed, parsed JSON content per `custom_id`.
+
+    With `parse`, each `(custom_id, content)` pair is replaced by what
+    `parse(custom_id, content)` returns, e.g. to strip an id suffix and
+    validate the content.
+    """
+
+    if client is None:
+        client = get_openai_client()
+    if client is None:
+        raise ValueError("OpenAI client is not available; the Batch API requires OPENAI_API_KEY.")
+
+    batch = await client.batches.retrieve(batch_id)
+    result: Dict[str, Any] = {"batch_id": batch.id, "status": batch.status, "results": {}}
+    if batch.status != "completed" or not batch.output_file_id:
+        return result
+
+    content = await client.files.content(batch.output_file_id)
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        row = orjson.loads(line)
+        custom_id = row.get("custom_id", "")
+        body = ((row.get("response") or {}).get("body") or {})
+        choices = body.get("choices") or []
+        text = choices[0]["message"]["content"] if choices else "{}"
+        parsed = safe_json_parse(text or "{}")
+        if parse is not None:
+            custom_id, parsed = parse(custom_id, parsed)
+        result["results"][custom_id] = parsed
+    return result
 
 
 def truncate_text(text: str, max_chars: int = 4000) -> str:
@@ -5,7 +5,7 @@ Validators to enforce platform constraints and safety checks on generated text.
 from __future__ import annotations
 
 import re
-from typing import Dict, List
+from typing import Callable, Dict, List
 
 from config.platform_rules import get_rules
 
@@ -17,41 +17,75 @@ def count_hashtags(text: str) -> int:
     return len(HASHTAG_RE.findall(text))
 
 
-def validate_platform(text: str, platform: str | None) -> Dict[str, object]:
+TOKEN_RE = re.compile(r"\S+|\s+")
+HASHTAG_TOKEN_RE = re.compile(r"#\w")
+
+
+def _filter_tokens(text: str, hashtags_max: int, linebreaks_ok: bool, issues: List[str]) -> str:
+    """Drop extra hashtags and flatten linebreaks in one left-to-right scan."""
+
+    out: List[str] = []
+    pending_ws = ""
+    dropped_any = False
+    last_dropped = False
+    hashtags_left = hashtags_max
+
+    for match in TOKEN_RE.finditer(text):
+        token = match.group()
+        if token[0].isspace():
+            # Keep only the first whitespace run between kept words
+            if not pending_ws:
+                if not linebreaks_ok and "\n" in token:
+                    token = token.replace("\n", " ")
+                    if "removed_linebreaks" not in issues:
+                        issues.append("removed_linebreaks")
+                pending_ws = token
+            continue
+
+        if HASHTAG_TOKEN_RE.match(token):
+            if hashtags_left <= 0:
+                issues.append("removed_extra_hashtags")
+                dropped_any = last_dropped = True
+                continue
+            hashtags_left -= 1
+
+        if pending_ws and (out or not dropped_any):
+            out.append(pending_ws)
+        pending_ws = ""
+        last_dropped = False
+        out.append(token)
+
+    if pending_ws and not last_dropped:
+        out.append(pending_ws)
+
+    return "".join(out)
+
+
+def make_validator(platform: str | None) -> Callable[[str], Dict[str, object]]:
+    """Resolve platform rules once and return a validator for many texts."""
+
     rules = get_rules(platform)
-    issues: List[str] = []
-    fixed = text
-
-    # Character limit
-    if len(fixed) > rules["max_chars"]:
-        fixed = fixed[: rules["max_chars"] - 1]
-        issues.append("trimmed_to_max_chars")
-
-    # Hashtag limit
-    hcount = count_hashtags(fixed)
-    if hcount > rules["hashtags_max"]:
-        # remove extra hashtags from the end heuristically
-        parts = fixed.split()
-        kept = []
-        keep_hashtags = rules["hashtags_max"]
-        for p in parts:
-            if p.startswith("#"):
-                if keep_hashtags > 0:
-                    kept.append(p)
-                    keep_hashtags -= 1
-                else:
-                    issues.append("removed_extra_hashtags")
-                    continue
-            else:
-                kept.append(p)
-        fixed = " ".join(kept)
-
-    # Linebreak policy
-    if not rules["linebreaks_ok"]:
-        if "\n" in fixed:
-            fixed = fixed.replace("\n", " ")
-            issues.append("removed_linebreaks")
-
-    return {"text": fixed, "issues": issues, "rules": rules}
+    max_chars = rules["max_chars"]
+    hashtags_max = rules["hashtags_max"]
+    linebreaks_ok = rules["linebreaks_ok"]
+
+    def validate(text: str) -> Dict[str, object]:
+        issues: List[str] = []
+        fixed = text
+
+        # Hashtag limit and linebreak policy; skip the scan when neither can apply
+        if "#" in fixed or (not linebreaks_ok and "\n" in fixed):
+            fixed = _filter_tokens(fixed, hashtags_max, linebreaks_ok, issues)
 
+        # Character limit, applied once after tokens have been dropped
+        if len(fixed) > max_chars:
+            fixed = fixed[: max_chars - 1]
+            issues.append("trimmed_to_max_chars")
 
+        return {"text": fixed, "issues": issues, "rules": rules}
+
+    return validate
+
+
+def validate_platform(text: str, platform: str | None) -> Dict[str, object]:
+    return make_validator(platform)(text)
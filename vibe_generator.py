@@ -8,12 +8,333 @@ local testing.
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import itertools
+import logging
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 
 from config.vibe_templates import VIBE_TEMPLATES
-from utils import get_openai_client, openai_json_completion, truncate_text
+from platform_advisor import PLATFORM_TIPS
+from utils import (LLMCache, build_cache, get_openai_client, iter_array_objects,
+                   openai_json_completion, openai_json_stream, settings, to_float, truncate_text)
 from rag.store import retrieve_docs
-from validators import validate_platform
+from validators import make_validator
+
+
+logger = logging.getLogger(__name__)
+
+# Canonical order of the five vibes in every response
+_ORDER = ("Professional", "Friendly", "Persuasive", "Concise", "Empathetic")
+
+# JSON mode needs a top-level object, so the array of vibes is wrapped in `vibes`
+_SYSTEM_PROMPT = (
+    "You rewrite short messages in multiple specific tones."
+    " Return a strict JSON object with key vibes: an array of exactly 5 objects, each having keys:"
+    " vibe, rewritten_text, explanation, use_cases (array of short strings)."
+    " The five vibes must be: Professional, Friendly, Persuasive, Concise, Empathetic."
+)
+
+_VIBE_INSTRUCTIONS = "\n".join(f"- {name}: {prompt[:180]}..." for name, prompt in VIBE_TEMPLATES.items())
+
+_PROMPT_HEADER = (
+    "Rewrite the message into five vibes using the guidance below, respond with JSON only.\n\n"
+    f"Vibe guidance:\n{_VIBE_INSTRUCTIONS}\n"
+)
+
+# Static (vibe, explanation, use_cases) for the offline fallback, already in _ORDER
+_FALLBACK_SKELETON: Tuple[Tuple[str, str, Tuple[str, str]], ...] = tuple(
+    (
+        vibe,
+        f"Uses {vibe.lower()} tone cues based on simple template guidance.",
+        (f"Use when you need a {vibe.lower()} tone.", "Useful for quick edits when time is limited."),
+    )
+    for vibe in _ORDER
+)
+
+# Returned as-is for empty or whitespace-only messages, which never reach RAG or the LLM
+_EMPTY_VIBES: Tuple[Dict[str, object], ...] = tuple(
+    {"vibe": vibe, "rewritten_text": "", "explanation": "Nothing to rewrite: the message is empty.", "use_cases": []}
+    for vibe in _ORDER
+)
+
+
+def _empty_vibes() -> List[Dict[str, object]]:
+    return [{**v, "use_cases": []} for v in _EMPTY_VIBES]
+
+
+_VIBE_CACHE: Optional[LLMCache] = None
+
+
+def _vibe_cache() -> LLMCache:
+    """Return the rewrite-set cache (6h TTL), creating it on first use."""
+
+    global _VIBE_CACHE
+    if _VIBE_CACHE is None:
+        _VIBE_CACHE = build_cache(maxsize=10_000, ttl=21600, prefix="svt:vibes:")
+    return _VIBE_CACHE
+
+
+def _vibe_cache_key(text: str, platform: Optional[str], user_id: Optional[str]) -> str:
+    # user_id is part of the key because retrieval is personalized per user
+    raw = f"{platform or ''}|{user_id or ''}|{text}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+_EMPTY = ""
+
+
+def _as_str(value: object) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+def normalize_vibes(items: List[Dict[str, object]], *, platform: Optional[str] = None) -> List[Dict[str, object]]:
+    """Coerce model-produced vibe objects into the response shape.
+
+    Applies platform validation to each rewritten text when a platform is given.
+    """
+
+    validator = make_validator(platform) if platform else None
+    normalized = []
+    for item in items:
+        text = _as_str(item.get("rewritten_text", _EMPTY))
+        if validator is not None:
+            text = validator(text)["text"]
+        # islice stops after four entries instead of converting the whole list
+        use_cases = item.get("use_cases") or ()
+        normalized.append({
+            "vibe": _as_str(item.get("vibe", _EMPTY)),
+            "rewritten_text": text,
+            "explanation": _as_str(item.get("explanation", _EMPTY)),
+            "use_cases": [_as_str(u) for u in itertools.islice(use_cases, 4)],
+        })
+    return normalized
+
+
+_KEYWORD_RE = re.compile(r"[a-z]{4,}")
+
+# Common 4+ letter words that carry no topic, ignored when keying retrieval
+_STOPWORDS = frozenset({
+    "about", "after", "again", "also", "been", "before", "being", "could", "does", "doing",
+    "down", "each", "from", "have", "having", "here", "into", "just", "more", "most",
+    "once", "only", "other", "over", "same", "should", "some", "such", "than", "that",
+    "their", "them", "then", "there", "these", "they", "this", "those", "through", "under",
+    "until", "very", "were", "what", "when", "where", "which", "while", "will", "with",
+    "would", "your", "yours", "please", "thanks", "hello",
+})
+
+
+@lru_cache(maxsize=4096)
+def _kw(text: str) -> Tuple[str, ...]:
+    """All distinct 4+ letter non-stopwords in `text`, sorted, as a retrieval cache key."""
+
+    return tuple(sorted(set(_KEYWORD_RE.findall(text.lower())) - _STOPWORDS))
+
+
+def _retrieval_key(*, text: str, platform: Optional[str], user_id: Optional[str], top_k: int) -> Tuple[Any, ...]:
+    # Edits to case, punctuation, word order or filler words share an entry;
+    # any change in topic words misses. Keyword-less messages key on the full text.
+    return hashkey(platform, user_id, top_k, _kw(text) or text)
+
+
+@cached(TTLCache(maxsize=4096, ttl=300), key=_retrieval_key, lock=threading.Lock())
+def _cached_retrieve_docs(*, text: str, platform: Optional[str], user_id: Optional[str], top_k: int) -> List[Dict[str, Any]]:
+    """Retrieve guidance for `text` with a 5-minute result cache keyed on its keywords."""
+
+    query = f"{platform or 'generic'} guidance for: {text}"
+    return retrieve_docs(query=query, platform=platform, user_id=user_id, top_k=top_k)
+
+
+def warm_retriever() -> None:
+    """Run one retrieval per known platform so the embedder and index are loaded."""
+
+    for platform in (None, *PLATFORM_TIPS):
+        try:
+            retrieve_docs(query=f"{platform or 'generic'} guidance", platform=platform, user_id=None, top_k=1)
+        except Exception as e:
+            logger.warning("Retriever warm-up error: %s", e)
+            return
+
+
+def _format_grounding(retrieved: List[Dict[str, Any]], *, titles_only: bool = False) -> str:
+    """Join retrieved docs into a compact guidance block, one line per unique title."""
+
+    if not retrieved:
+        return ""
+    unique: Dict[str, Dict[str, Any]] = {}
+    for r in retrieved:
+        unique.setdefault(r["title"], r)
+    if titles_only:
+        lines = (f"- {title}" for title in unique)
+    else:
+        lines = (f"- {title}: {r['text'][:120]}" for title, r in unique.items())
+    return "\n\nRetrieved guidance:\n" + "\n".join(lines)
+
+
+async def build_vibe_prompt(text: str, *, platform: Optional[str] = None, user_id: Optional[str] = None) -> str:
+    """Build the user prompt with vibe guidance and retrieved RAG grounding."""
+
+    return _PROMPT_HEADER + await _build_message_block(text, platform=platform, user_id=user_id)
+
+
+async def _build_message_block(text: str, *, platform: Optional[str], user_id: Optional[str]) -> str:
+    """Return the per-message part of the prompt: RAG grounding plus the message.
+
+    Retrieval is blocking, so it runs in a worker thread; it is skipped
+    entirely when `RAG_ENABLED=0`.
+    """
+
+    config = settings()
+    message_block = f"\n\nMessage: {text}\n"
+    if not config.rag_enabled:
+        return message_block
+
+    retrieved = await asyncio.to_thread(
+        _cached_retrieve_docs,
+        text=text,
+        platform=platform,
+        user_id=user_id,
+        top_k=config.rag_top_k,
+    )
+    grounding = _format_grounding(retrieved, titles_only=config.rag_fetch_payload == "ids-only")
+    # Callers put the static header first so the prompt prefix is byte-identical across calls
+    return grounding + message_block
+
+
+async def _single_completion(client: Any, block: str) -> Any:
+    # Not completion-cached: only validated sets go into the rewrite-set cache
+    result = await openai_json_completion(client=client, system_prompt=_SYSTEM_PROMPT, user_prompt=_PROMPT_HEADER + block)
+    return result.get("vibes") if isinstance(result, dict) else result
+
+
+# With VIBE_PARALLEL=1 each vibe is its own small request, run concurrently,
+# so latency is the slowest single vibe rather than one long five-vibe answer.
+
+_ONE_VIBE_SYSTEM_PROMPT = (
+    "You rewrite short messages in one specific tone."
+    " Return a strict JSON object with keys:"
+    " vibe, rewritten_text, explanation, use_cases (array of short strings)."
+)
+
+
+async def _one_vibe(client: Any, vibe: str, block: str) -> Dict[str, Any]:
+    guidance = VIBE_TEMPLATES.get(vibe, "")
+    user = f"Vibe: {vibe}\nVibe guidance: {guidance[:180]}...{block}"
+    result = await openai_json_completion(client=client, system_prompt=_ONE_VIBE_SYSTEM_PROMPT, user_prompt=user)
+    if not isinstance(result, dict):
+        raise ValueError(f"Invalid {vibe} rewrite")
+    # The requested vibe is authoritative even if the model renames it
+    return {**result, "vibe": vibe}
+
+
+async def _parallel_completion(client: Any, block: str) -> List[Dict[str, Any]]:
+    """Request all five vibes concurrently; fails if any single vibe fails."""
+
+    results = await asyncio.gather(*(_one_vibe(client, vibe, block) for vibe in _ORDER), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return list(results)  # type: ignore[arg-type]
+
+
+# ------------------------------ Micro-batching ------------------------------ #
+# With VIBE_BATCH_WINDOW_MS > 0, requests arriving within the window share one
+# completion that rewrites up to VIBE_BATCH_MAX messages at once.
+
+_BATCH_SYSTEM_PROMPT = (
+    "You rewrite short messages in multiple specific tones."
+    " You will receive several numbered items, each with a message."
+    " Return a strict JSON object with key results: an array with one entry per item, in item order."
+    " Each entry is an array of exactly 5 objects, each having keys:"
+    " vibe, rewritten_text, explanation, use_cases (array of short strings)."
+    " The five vibes must be: Professional, Friendly, Persuasive, Concise, Empathetic."
+)
+
+_batch_queue: Optional["asyncio.Queue[Tuple[Any, str, asyncio.Future]]"] = None
+_batch_loop: Optional[asyncio.AbstractEventLoop] = None
+_batch_tasks: Set["asyncio.Task[None]"] = set()
+
+
+def _spawn(coro: Any) -> None:
+    # Keep a reference so background tasks are not garbage-collected mid-run
+    task = asyncio.create_task(coro)
+    _batch_tasks.add(task)
+    task.add_done_callback(_batch_tasks.discard)
+
+
+async def _coalesced_completion(client: Any, block: str) -> Any:
+    """Queue one message for the batcher and wait for its five vibes."""
+
+    global _batch_queue, _batch_loop
+    loop = asyncio.get_running_loop()
+    if _batch_queue is None or _batch_loop is not loop:
+        _batch_queue = asyncio.Queue()
+        _batch_loop = loop
+        _spawn(_batcher(_batch_queue))
+
+    future: asyncio.Future = loop.create_future()
+    await _batch_queue.put((client, block, future))
+    return await future
+
+
+async def _batcher(queue: "asyncio.Queue[Tuple[Any, str, asyncio.Future]]") -> None:
+    """Collect queued requests for up to the batch window, then dispatch them."""
+
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + settings().vibe_batch_window_ms / 1000
+        while len(batch) < settings().vibe_batch_max:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Dispatch in the background so the next window starts collecting now
+        _spawn(_run_batch(batch))
+
+
+async def _run_batch(batch: List[Tuple[Any, str, asyncio.Future]]) -> None:
+    """Resolve each request's future from one shared completion.
+
+    Single-item batches use the regular prompt. If the combined response is
+    malformed, every item falls back to its own completion.
+    """
+
+    results: Optional[List[Any]] = None
+    if len(batch) > 1:
+        client = batch[0][0]
+        user = _PROMPT_HEADER + "".join(f"\n### Item {i + 1}{block}" for i, (_, block, _) in enumerate(batch))
+        try:
+            combined = await openai_json_completion(client=client, system_prompt=_BATCH_SYSTEM_PROMPT, user_prompt=user)
+            candidate = combined.get("results") if isinstance(combined, dict) else None
+            if isinstance(candidate, list) and len(candidate) == len(batch):
+                results = candidate
+        except Exception as e:
+            logger.warning("Vibe batch error: %s", e)
+
+    if results is None:
+        results = list(await asyncio.gather(
+            *(_single_completion(client, block) for client, block, _ in batch),
+            return_exceptions=True,
+        ))
+
+    for (_, _, future), result in zip(batch, results):
+        if future.done():
+            continue
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
 
 
 async def generate_vibes(message: str, *, platform: Optional[str] = None, user_id: Optional[str] = None) -> List[Dict[str, object]]:
@@ -22,72 +343,193 @@ async def generate_vibes(message: str, *, platform: Optional[str] = None, user_i
     Each item includes: vibe, rewritten_text, explanation, use_cases (list of strings).
     """
 
+    timings: Dict[str, Any] = {
+        "t_retrieve_ms": 0.0,
+        "t_openai_ms": 0.0,
+        "t_normalize_ms": 0.0,
+        "cache_hit": False,
+    }
+    start = time.perf_counter()
+    try:
+        return await _generate_vibes(message, platform=platform, user_id=user_id, timings=timings)
+    finally:
+        timings["total_ms"] = (time.perf_counter() - start) * 1000
+        logger.info("vibe_gen", extra={**timings, "platform": platform, "user_id": user_id})
+
+
+async def _generate_vibes(
+    message: str, *, platform: Optional[str], user_id: Optional[str], timings: Dict[str, Any]
+) -> List[Dict[str, object]]:
+    """Body of `generate_vibes`; records per-phase durations into `timings`."""
+
     text = truncate_text(message, 2000)
+    if not text.strip():
+        timings["empty"] = True
+        return _empty_vibes()
+
+    # Finished rewrite sets are cached so repeats skip both RAG and the LLM
+    cache_key = _vibe_cache_key(text, platform, user_id)
+    try:
+        cached = await _vibe_cache().get(cache_key)
+    except Exception:
+        cached = None
+    if cached is not None:
+        timings["cache_hit"] = True
+        # Copy so callers (e.g. the ranker adding scores) can't mutate the cache
+        return [dict(v) for v in cached]
+
     client = get_openai_client()
 
     # We'll ask the model to return JSON for all five vibes in one shot
-    retrieved = retrieve_docs(query=f"{platform or 'generic'} guidance for: {text}", platform=platform, user_id=user_id, top_k=5)
-    grounding = "\n\nRetrieved guidance:\n" + "\n".join([f"- {r['title']}: {r['text'][:240]}" for r in retrieved]) if retrieved else ""
-
-    system = (
-        "You rewrite short messages in multiple specific tones."
-        " Return strict JSON array with exactly 5 objects, each having keys:"
-        " vibe, rewritten_text, explanation, use_cases (array of short strings)."
-        " The five vibes must be: Professional, Friendly, Persuasive, Concise, Empathetic."
-    )
-    vibe_instructions = "\n".join([f"- {name}: {prompt[:180]}..." for name, prompt in VIBE_TEMPLATES.items()])
-    user = (
-        "Rewrite the message into five vibes using the guidance below, respond with JSON only.\n\n"
-        f"Message: {text}\n\nVibe guidance:\n{vibe_instructions}\n"
-        f"{grounding}"
-    )
+    t0 = time.perf_counter()
+    block = await _build_message_block(text, platform=platform, user_id=user_id)
+    timings["t_retrieve_ms"] = (time.perf_counter() - t0) * 1000
 
     try:
-        result = await openai_json_completion(client=client, system_prompt=system, user_prompt=user)
-        print(f"DEBUG: Generated result type={type(result)}, len={len(result) if isinstance(result, list) else 'N/A'}, content={result}")
+        t0 = time.perf_counter()
+        try:
+            if client is not None and settings().vibe_parallel:
+                result = await _parallel_completion(client, block)
+            elif client is not None and settings().vibe_batch_window_ms > 0:
+                result = await _coalesced_completion(client, block)
+            else:
+                result = await _single_completion(client, block)
+        finally:
+            timings["t_openai_ms"] = (time.perf_counter() - t0) * 1000
+        logger.debug("vibe_gen result type=%s len=%s", type(result).__name__, len(result) if isinstance(result, list) else -1)
         if isinstance(result, list) and len(result) == 5:
-            # Basic normalization
-            normalized = []
-            for item in result:
-                text = str(item.get("rewritten_text", ""))
-                if platform:
-                    vp = validate_platform(text, platform)
-                    text = vp["text"]
-                normalized.append({
-                    "vibe": str(item.get("vibe", "")),
-                    "rewritten_text": text,
-                    "explanation": str(item.get("explanation", "")),
-                    "use_cases": [str(u) for u in item.get("use_cases", [])][:4],
-                })
-            return normalized
-        else:
-            print(f"DEBUG: Result format mismatch - expected list of 5, got {type(result)} with len {len(result) if isinstance(result, list) else 'N/A'}")
+            t0 = time.perf_counter()
+            normalized = normalize_vibes(result, platform=platform)
+            timings["t_normalize_ms"] = (time.perf_counter() - t0) * 1000
+            try:
+                await _vibe_cache().set(cache_key, normalized)
+            except Exception:
+                pass
+            return [dict(v) for v in normalized]
+        logger.debug("vibe_gen result format mismatch, expected list of 5")
     except Exception as e:
-        # Log the error for debugging
-        print(f"Vibe generation error: {e}")
-        pass
-
-    # Local deterministic fallback for offline demos
-    rewrites = []
-    for vibe, template in VIBE_TEMPLATES.items():
-        rewritten = f"[{vibe}] {text}"
-        explanation = f"Uses {vibe.lower()} tone cues based on simple template guidance."
-        use_cases = [
-            f"Use when you need a {vibe.lower()} tone.",
-            "Useful for quick edits when time is limited.",
-        ]
-        rewrites.append(
-            {
-                "vibe": vibe,
-                "rewritten_text": rewritten,
-                "explanation": explanation,
-                "use_cases": use_cases,
-            }
-        )
-
-    # Ensure we always return exactly in the standard order
-    order = ["Professional", "Friendly", "Persuasive", "Concise", "Empathetic"]
-    by_name = {r["vibe"]: r for r in rewrites}
-    return [by_name[name] for name in order]
+        logger.warning("Vibe generation error: %s", e)
+
+    return _fallback_vibes(text)
+
+
+def _fallback_vibes(text: str) -> List[Dict[str, object]]:
+    # Local deterministic fallback for offline demos, in the standard order
+    return [
+        {"vibe": vibe, "rewritten_text": f"[{vibe}] {text}", "explanation": explanation, "use_cases": list(use_cases)}
+        for vibe, explanation, use_cases in _FALLBACK_SKELETON
+    ]
+
+
+async def stream_vibes(message: str, *, platform: Optional[str] = None, user_id: Optional[str] = None) -> AsyncIterator[Dict[str, object]]:
+    """Yield each vibe as soon as the model finishes writing it.
+
+    Streams the OpenAI completion and parses vibes incrementally. Shares the
+    rewrite-set cache with `generate_vibes`: a cached set is yielded at once,
+    and a complete streamed set of five is stored. If the stream fails part
+    way, the missing vibes are filled in from the template fallback. Without
+    a client, or if the stream fails before producing anything, falls back
+    to `generate_vibes` and yields its results.
+    """
+
+    text = truncate_text(message, 2000)
+    if not text.strip():
+        for vibe in _empty_vibes():
+            yield vibe
+        return
+    cache_key = _vibe_cache_key(text, platform, user_id)
+    try:
+        cached = await _vibe_cache().get(cache_key)
+    except Exception:
+        cached = None
+    if cached is not None:
+        for vibe in cached:
+            yield dict(vibe)
+        return
+
+    client = get_openai_client()
+    streamed: List[Dict[str, object]] = []
+
+    if client is not None:
+        user = await build_vibe_prompt(text, platform=platform, user_id=user_id)
+        try:
+            chunks = openai_json_stream(client=client, system_prompt=_SYSTEM_PROMPT, user_prompt=user)
+            async for item in iter_array_objects(chunks):
+                vibe = normalize_vibes([item], platform=platform)[0]
+                streamed.append(vibe)
+                yield dict(vibe)
+        except Exception as e:
+            logger.warning("Vibe streaming error: %s", e)
+
+    if len(streamed) == len(_ORDER):
+        try:
+            await _vibe_cache().set(cache_key, streamed)
+        except Exception:
+            pass
+    if streamed:
+        # A stream cut short still ends with one line per vibe; the gaps come from the fallback
+        seen = {vibe["vibe"] for vibe in streamed}
+        for vibe in _fallback_vibes(text):
+            if vibe["vibe"] not in seen:
+                yield vibe
+        return
+    for vibe in await generate_vibes(message, platform=platform, user_id=user_id):
+        yield vibe
+
+
+# Vibes and judge scores in one completion, for /rewrite_top
+_FUSED_SYSTEM_PROMPT = (
+    "You rewrite short messages in multiple specific tones and evaluate the rewrites."
+    " Return a strict JSON object with keys:"
+    " vibes (array of exactly 5 objects with keys vibe, rewritten_text, explanation, use_cases (array of short strings)),"
+    " scores (array of 5 numbers 0-10, one per vibe in the same order)."
+    " The five vibes must be: Professional, Friendly, Persuasive, Concise, Empathetic."
+    " Score each vibe on tone alignment to the target tone, clarity, and platform fit."
+)
+
+
+async def generate_scored_vibes(
+    message: str, *, target_tone: str, platform: Optional[str] = None, user_id: Optional[str] = None
+) -> Tuple[List[Dict[str, object]], Optional[List[float]]]:
+    """Generate the five vibes and score them for `target_tone` in one completion.
+
+    Uses the same vibe guidance, RAG grounding and rewrite-set cache as
+    `generate_vibes`, so both endpoints return the same rewrites. Scores are
+    None when the vibes come from the cache or `generate_vibes`, or when the
+    model's scores are malformed; callers then rank the vibes separately.
+    Empty messages get empty vibes with zero scores and no LLM call.
+    """
+
+    text = truncate_text(message, 2000)
+    if not text.strip():
+        # Nothing to judge either, so fixed scores keep empty input away from the LLM
+        return _empty_vibes(), [0.0] * len(_ORDER)
+
+    try:
+        cached = await _vibe_cache().get(_vibe_cache_key(text, platform, user_id))
+    except Exception:
+        cached = None
+
+    if cached is None:
+        block = await _build_message_block(text, platform=platform, user_id=user_id)
+        # Target tone goes last so the vibe guidance stays a shared prompt prefix
+        user = f"{_PROMPT_HEADER}{block}Target tone: {target_tone}\nPlatform: {platform or 'generic'}\n"
+        try:
+            fused = await openai_json_completion(client=get_openai_client(), system_prompt=_FUSED_SYSTEM_PROMPT, user_prompt=user)
+        except Exception as e:
+            logger.warning("Fused vibe generation error: %s", e)
+            fused = None
 
+        raw_vibes = fused.get("vibes") if isinstance(fused, dict) else None
+        if isinstance(raw_vibes, list) and len(raw_vibes) == 5 and all(isinstance(v, dict) for v in raw_vibes):
+            normalized = normalize_vibes(raw_vibes, platform=platform)
+            try:
+                await _vibe_cache().set(_vibe_cache_key(text, platform, user_id), normalized)
+            except Exception:
+                pass
+            scores = fused.get("scores")
+            if isinstance(scores, list) and len(scores) == len(normalized):
+                return [dict(v) for v in normalized], [to_float(score, 0.0) for score in scores]
+            return [dict(v) for v in normalized], None
 
+    return await generate_vibes(message, platform=platform, user_id=user_id), None